@@ -0,0 +1,100 @@
+"""
+Tests for the ucLog multi source merge, run with pytest
+
+"""
+import random
+from ucLogMerge import LogMerge
+
+WINDOW = 0.5
+
+
+def _line(t: float, source: str) -> tuple:
+    # same layout as UCLOG.add_log_line() items, timestamp at index 1
+    return 0, t, "INFO", f"{source}.c", 1, "msg"
+
+
+def _timestamps(ready: list) -> list:
+    return [item[1] for _, item in ready]
+
+
+def test_single_source_no_delay():
+    merge = LogMerge(window=WINDOW)
+    for i in range(10):
+        merge.push("a", _line(i * 0.1, "a"), now=0.0)
+        assert merge.pop_ready(now=0.0) == [("a", _line(i * 0.1, "a"))]
+
+    assert not merge.pending()
+
+
+def test_interleaved_sources_in_order():
+    rnd = random.Random(0)
+    sources = {s: [_line(i * 0.1 + j * 0.03, s) for i in range(50)] for j, s in enumerate("abc")}
+    merge = LogMerge(window=5.0)
+
+    # every source is known before the lines are interleaved
+    for s, lines in sources.items():
+        merge.push(s, lines.pop(0), now=0.0)
+
+    ready = []
+    now = 0.0
+    while any(sources.values()):
+        now += 0.001
+        s = rnd.choice([s for s, lines in sources.items() if lines])
+        merge.push(s, sources[s].pop(0), now=now)
+        ready += merge.pop_ready(now=now)
+
+    ready += merge.pop_ready(now=now + 2 * merge.window)
+    ts = _timestamps(ready)
+    assert len(ts) == 150
+    assert ts == sorted(ts)
+
+
+def test_live_source_holds_newer_lines():
+    merge = LogMerge(window=WINDOW)
+    merge.push("a", _line(0.0, "a"), now=0.0)
+    merge.push("b", _line(0.1, "b"), now=0.0)
+
+    # "a" may still send lines between 0.0 and 0.1
+    assert _timestamps(merge.pop_ready(now=0.0)) == [0.0]
+    assert _timestamps(merge.pop_ready(now=0.1)) == []
+    assert merge.pending()
+
+    merge.push("a", _line(0.2, "a"), now=0.2)
+    assert _timestamps(merge.pop_ready(now=0.2)) == [0.1]
+
+
+def test_silent_source_stops_holding_after_window():
+    merge = LogMerge(window=WINDOW)
+    merge.push("a", _line(0.0, "a"), now=0.0)
+    merge.push("b", _line(0.1, "b"), now=0.0)
+    merge.pop_ready(now=0.0)
+
+    assert _timestamps(merge.pop_ready(now=WINDOW)) == []
+    assert _timestamps(merge.pop_ready(now=WINDOW + 0.01)) == [0.1]
+    assert not merge.pending()
+
+
+def test_lines_beyond_horizon_released():
+    merge = LogMerge(window=WINDOW)
+    merge.push("a", _line(0.0, "a"), now=0.0)
+    merge.push("b", _line(0.0, "b"), now=0.0)
+    merge.pop_ready(now=0.0)
+
+    # "a" is live but lagging, "b" runs ahead of it by more than the window
+    merge.push("b", _line(5.0, "b"), now=0.01)
+    assert _timestamps(merge.pop_ready(now=0.01)) == []
+
+    merge.push("b", _line(5.6, "b"), now=0.02)
+    assert _timestamps(merge.pop_ready(now=0.02)) == [5.0]
+    assert merge.pending()
+
+
+def test_clear():
+    merge = LogMerge(window=WINDOW)
+    merge.push("a", _line(0.0, "a"), now=0.0)
+    merge.push("b", _line(1.0, "b"), now=0.0)
+    merge.clear()
+
+    assert not merge.pending()
+    merge.push("b", _line(2.0, "b"), now=0.0)
+    assert _timestamps(merge.pop_ready(now=0.0)) == [2.0]
@@ -47,16 +47,16 @@ log_lines = [
     (24, 0.0314919, 'INFO', 'Core/Src/main.c', 432, 'uptics: 350181, reset reason PO BO PIN SFT '),
 ]
 log_lines *= 100  # make larger to load the widget
-log_lines = deque(log_lines)  # uses less CPU
 
 run_thread = True
-def thrd_send_lines(uclog):
-    logger.info(f"start, log lines {len(log_lines)}")
-    timer_started = timer()
-    while run_thread and log_lines:
-        line_to_add = list(log_lines.popleft())
+timer_started = timer()
+def thrd_send_lines(uclog, source):
+    lines = deque(log_lines)  # uses less CPU, one per source so threads don't race on it
+    logger.info(f"start {source}, log lines {len(lines)}")
+    while run_thread and lines:
+        line_to_add = list(lines.popleft())
         line_to_add[1] = timer() - timer_started
-        uclog.add_log_line(line_to_add)
+        uclog.add_log_line(line_to_add, source=source)
         delay = random.uniform(0.01, 0.2)
         time.sleep(delay)
 
@@ -81,9 +81,11 @@ def main() -> None:
     with dcg.Window(C, label="Main", primary=True):
         dcg.Text(C, value="Now showing CPU, FPS, and Max FPS in the viewport menu bar.")
 
-    uclog = UCLOG(C)
+    uclog = UCLOG(C)  # UCLOG(C, columns=True) shows one column per field
 
-    Thread(target=thrd_send_lines, args=(uclog,), daemon=True).start()
+    # two producers, like two cores/UARTs, each sending its own copy of the lines
+    Thread(target=thrd_send_lines, args=(uclog, "core0"), daemon=True).start()
+    Thread(target=thrd_send_lines, args=(uclog, "core1"), daemon=True).start()
 
     try:
         loop.run_until_complete(run_viewport_loop(C.viewport))
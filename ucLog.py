@@ -7,7 +7,10 @@ TODOs
 """
 from threading import Thread, Event, Timer
 import queue
+import bisect
+import numpy as np
 import dearcygui as dcg
+from ucLogMerge import LogMerge
 import colorsys
 from enum import IntEnum
 import traceback
@@ -17,14 +20,167 @@ import logging
 logger = logging.getLogger()
 
 
+class LogStore:
+    """ Fields of every log line, in arrival order (row number)
+
+    Numeric fields are kept in numpy arrays so sort keys are built with
+    vector operations instead of re-reading widget text.  Level, file and
+    source are stored as indexes into the name lists kept by UCLOG.
+    """
+    CAPACITY_DEFAULT = 1024
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self) -> None:
+        self.n = 0
+        self.t = np.zeros(self.CAPACITY_DEFAULT, dtype=np.float64)
+        self.lvl = np.zeros(self.CAPACITY_DEFAULT, dtype=np.int8)
+        self.file = np.zeros(self.CAPACITY_DEFAULT, dtype=np.int32)
+        self.line = np.zeros(self.CAPACITY_DEFAULT, dtype=np.int64)
+        self.source = np.zeros(self.CAPACITY_DEFAULT, dtype=np.int32)
+        self.msg = []
+
+    def append(self, t: float, lvl: int, file: int, line: int, source: int, msg: str) -> None:
+        if self.n == len(self.t):
+            self._grow()
+
+        self.t[self.n] = t
+        self.lvl[self.n] = lvl
+        self.file[self.n] = file
+        self.line[self.n] = line
+        self.source[self.n] = source
+        self.msg.append(msg)
+        self.n += 1
+
+    def _grow(self) -> None:
+        # double the capacity, keeps appends amortized O(1)
+        for name in ("t", "lvl", "file", "line", "source"):
+            old = getattr(self, name)
+            new = np.zeros(2 * len(old), dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+
+class LogSortIndex:
+    """ Row order of a LogStore sorted on one field
+
+    The order is built once with a stable argsort of the field keys, rows
+    appended afterwards are argsorted on their own and merged in with
+    searchsorted, so the history is not re-sorted.  Equal keys keep their
+    arrival order.  Sorting on "file" sorts on file name then line number.
+
+    Only rows from `start` on (the rows still in the table) are indexed,
+    drop() moves `start` forward when rows are purged, so the index never
+    grows past the table size.
+    """
+    FIELDS = ["time", "level", "file", "line", "message"]
+
+    def __init__(self, store: LogStore):
+        self._store = store
+        self.field = None
+        self.clear()
+
+    def clear(self) -> None:
+        self.order = np.zeros(0, dtype=np.int64)    # row numbers from start, in sorted order
+        self.start = 0                              # first row in the index
+        self._n = 0                                 # rows of the store in the index
+        self._num_files = 0
+        # keys of self.order, empty keys of the field dtype so update() can merge into them
+        self._keys = None if self.field is None else self._keys_for(0, 0, [])
+
+    def _keys_for(self, start: int, end: int, files: list):
+        s = self._store
+        match self.field:
+            case "time":
+                return s.t[start:end]
+            case "level":
+                return s.lvl[start:end]
+            case "file":
+                # rank file names alphabetically, then pack (rank, line) into one int64
+                rank = np.empty(len(files), dtype=np.int64)
+                rank[np.argsort(np.array(files, dtype=object), kind="stable")] = np.arange(len(files))
+                return (rank[s.file[start:end]] << 32) + s.line[start:end]
+            case "line":
+                return s.line[start:end]
+            case "message":
+                return np.array(s.msg[start:end], dtype=object)
+
+        raise ValueError(f"unknown sort field {self.field}")
+
+    def set_field(self, field: str, files: list) -> int:
+        """ Sort all rows on field
+        :param field: one of FIELDS, None for arrival order
+        :param files: file names, indexed by LogStore.file
+        :return: first position of the order that changed (always 0)
+        """
+        self.field = field
+        if field is None:
+            self.clear()
+            return 0
+
+        start = self.start
+        self.clear()
+        self.start = start
+
+        keys = self._keys_for(self.start, self._store.n, files)
+        order = np.argsort(keys, kind="stable")
+        self.order = order.astype(np.int64) + self.start
+        self._keys = keys[order]
+        self._n = self._store.n
+        self._num_files = len(files)
+        return 0
+
+    def update(self, files: list) -> int | None:
+        """ Merge rows appended to the store since the last call
+        :param files: file names, indexed by LogStore.file
+        :return: first position of the order that changed, None if unchanged
+        """
+        if self.field is None or self._n == self._store.n:
+            return None
+
+        if self.field == "file" and len(files) != self._num_files:
+            # a new file name can change the rank of the others
+            return self.set_field(self.field, files)
+
+        first_new = max(self._n, self.start)
+        keys = self._keys_for(first_new, self._store.n, files)
+        new_order = np.argsort(keys, kind="stable")
+        keys = keys[new_order]
+        pos = np.searchsorted(self._keys, keys, side="right")
+        self.order = np.insert(self.order, pos, new_order + first_new)
+        self._keys = np.insert(self._keys, pos, keys)
+        self._n = self._store.n
+        return int(pos[0])
+
+    def drop(self, start: int) -> None:
+        """ Remove rows before start from the index, order of the others is kept
+        :param start: first row to keep
+        """
+        self.start = start
+        if self.field is None:
+            return
+
+        keep = self.order >= start
+        self.order = self.order[keep]
+        self._keys = self._keys[keep]
+
+
 class UCLOG(Thread):
     """ ucLog GUI Instance
 
+    :param ctx: dearcygui context
+    :param reorder_window: max seconds a line waits for older lines from other sources
+    :param columns: show time, level, file, line, source and message in resizable columns
     """
     WINDOW_TITLE = "ucLog"
     TABLE_MAX_ROWS = 20000
     TABLE_ROWS_DELETE_CHUNK = int(TABLE_MAX_ROWS / 10)  # num rows to purge when MAX exceeded
     TABLE_SCROLL_TIMEOUT_SEC = 0.1
+    MERGE_REORDER_WINDOW_SEC = 0.25  # max time a line is held back waiting for other sources
+    SOURCE_DEFAULT = "main"
+    TABLE_SORT_TIMEOUT_SEC = 1.0  # sorted view is updated with new lines at most this often
+    LEVEL_COUNTS_TIMEOUT_SEC = 0.25  # level counters are redrawn at most this often
 
     class Events(IntEnum):
         EVENT_SHUTDOWN = 0
@@ -35,18 +191,40 @@ class UCLOG(Thread):
         EVENT_EXPORT = 5
         EVENT_TIMER_CLEAR_TITLEBAR = 6
         EVENT_PURGE_LOG_LINES = 7
+        EVENT_MERGE_FLUSH = 8
+        EVENT_APPLY_SOURCE_FILTER = 9
+        EVENT_NAV_JUMP = 10
+        EVENT_SORT = 11
+        EVENT_SORT_UPDATE = 12
+        EVENT_UPDATE_LEVEL_COUNTS = 13
 
     NUM_FILENAME_COLORS = 100
     COMBO_LEVEL_WIDTH = 120
     COMBO_FILES_WIDTH = 200
     COMBO_FILES_ITEMS_DEFAULT = ["File Filter", "All ON", "All OFF"]
+    COMBO_SOURCES_WIDTH = 120
+    COMBO_SOURCES_ITEMS_DEFAULT = ["Source Filter", "All ON", "All OFF"]
     BUTTON_CLEAR_WIDTH = 60
     BUTTON_EXPORT_WIDTH = BUTTON_CLEAR_WIDTH
     COMBO_SCALE_WIDTH = 90
+    BUTTON_NAV_WIDTH = 30
+    TEXT_LEVEL_COUNTS_WIDTH = 360  # fixed, so growing counts don't shift the toolbar
+    NAV_LEVELS = ["ERROR", "WARN"]  # levels with next/previous buttons
+    COMBO_SORT_WIDTH = 130
+    COMBO_SORT_ITEMS = {
+        # combo item: LogSortIndex field
+        "Sort: Arrival": None,
+        "Sort: Time": "time",
+        "Sort: Level": "level",
+        "Sort: File, Line": "file",
+        "Sort: Line": "line",
+        "Sort: Message": "message",
+    }
+
+    # columns mode, (label, width), width 0 stretches
+    TABLE_COLUMNS = [("Time", 80), ("Level", 50), ("File", 240), ("Line", 50), ("Source", 70), ("Message", 0)]
 
     ROW_USERDATA_IDX_ROW = 0
-    ROW_USERDATA_IDX_LEVEL = 1
-    ROW_USERDATA_IDX_FILE = 2
 
     # levels, listed in the order of show precedence
     LOG_LEVEL_COLORS = {
@@ -105,11 +283,31 @@ class UCLOG(Thread):
 
             self._palette.append(bg)
 
-    def __init__(self, ctx):
+    def __init__(self, ctx, reorder_window: float = MERGE_REORDER_WINDOW_SEC, columns: bool = False):
         super().__init__()
         self._ctx = ctx
         self._q = queue.SimpleQueue()
         self._stop_event = Event()
+        self._columns = columns
+
+        # fields of every row, sorting and export work from these, not from the widgets
+        self._store = LogStore()
+        self._sort_index = LogSortIndex(self._store)
+        self._sort_timer = None
+        self._row_at = []   # table row -> row, identity unless the view is sorted
+        self._row_pos = []  # row -> table row
+
+        # lines from several sources are merged by timestamp before reaching the table
+        self._merge = LogMerge(window=reorder_window)
+        self._merge_timer = None
+        self._sources = []
+        self._sources_filter = {
+            "all_on": True,
+            "all_off": False,
+
+            # source ids will be keys here as follows
+            # "source": <True/False>
+        }
 
         self._num_rows = 0
         self._num_rows_start = 0
@@ -127,6 +325,19 @@ class UCLOG(Thread):
         self._scroll_last_time = 0.0
         self._scroll_timer = None
 
+        self._level_counts = {}  # level -> number of rows, full history
+        self._level_counts_last_time = 0.0
+        self._level_counts_timer = None
+
+        # navigation index, row numbers in arrival order, so every list is sorted
+        # and a jump is a binary search
+        self._nav_rows = {}     # (level, file, source) -> [row, ...], live rows only, used for jumps
+        self._nav_row = None    # row of the last jump or click, None is the start/end
+        # sorted view, (level, file, source) -> sorted table rows of the first
+        # _nav_pos_n rows, rebuilt each time the view is sorted
+        self._nav_pos = {}
+        self._nav_pos_n = 0
+
         self._font = dcg.AutoFont.get_monospaced(self._ctx)
         self._theme_font = dcg.ThemeStyleImGui(self._ctx,
                                                frame_padding=(0,0),
@@ -143,6 +354,8 @@ class UCLOG(Thread):
         self._create_color_pallette()
         self._levels = list(self.LOG_LEVEL_COLORS.keys())
         self._show_levels = self._levels[self._levels.index("INFO"):]
+        for lvl in self._levels:
+            self._level_counts[lvl] = 0
 
         with dcg.Window(self._ctx,
                         label="ucLog",
@@ -166,6 +379,21 @@ class UCLOG(Thread):
                                               value="INFO",
                                               callback=self._cb_set_level_filter)
 
+                for lvl in self.NAV_LEVELS:
+                    for forward, label in ((False, f"<{lvl[0]}"), (True, f"{lvl[0]}>")):
+                        _button_nav = dcg.Button(self._ctx,
+                                                 label=label,
+                                                 width=self.BUTTON_NAV_WIDTH,
+                                                 user_data=(lvl, forward),
+                                                 callback=self._cb_button_nav)
+
+                        with dcg.Tooltip(self._ctx, target=_button_nav):
+                            dcg.Text(self._ctx, value=f"{'Next' if forward else 'Previous'} {lvl}")
+
+                self._text_level_counts = dcg.Text(self._ctx,
+                                                   width=self.TEXT_LEVEL_COUNTS_WIDTH,
+                                                   value=self._level_counts_str())
+
                 self._combo_files = dcg.Combo(self._ctx,
                                               width=self.COMBO_FILES_WIDTH,
                                               label="",
@@ -173,11 +401,25 @@ class UCLOG(Thread):
                                               value=self.COMBO_FILES_ITEMS_DEFAULT[0],
                                               callback=self._cb_set_file_filter)
 
+                self._combo_sources = dcg.Combo(self._ctx,
+                                                width=self.COMBO_SOURCES_WIDTH,
+                                                label="",
+                                                items=self.COMBO_SOURCES_ITEMS_DEFAULT,
+                                                value=self.COMBO_SOURCES_ITEMS_DEFAULT[0],
+                                                callback=self._cb_set_source_filter)
+
                 self._checkbox_scroll = dcg.Checkbox(self._ctx,
                                                      label="Scroll",
                                                      callback=self._cb_scroll,
                                                      value=True)
 
+                dcg.Combo(self._ctx,
+                          label="",
+                          items=list(self.COMBO_SORT_ITEMS.keys()),
+                          width=self.COMBO_SORT_WIDTH,
+                          value=list(self.COMBO_SORT_ITEMS.keys())[0],
+                          callback=self._cb_combo_sort)
+
                 self._button_clear = dcg.Button(self._ctx,
                                                 label="Clear",
                                                 width=self.BUTTON_CLEAR_WIDTH,
@@ -191,12 +433,19 @@ class UCLOG(Thread):
                           callback=self._cb_combo_scale)
 
             self._table = dcg.Table(self._ctx,
-                                    header=False,
+                                    header=self._columns,
                                     width=-1,
                                     height=-1,
                                     font=self._font,
                                     theme=self._theme_font,
-                                    flags=dcg.TableFlag.SCROLL_Y)
+                                    flags=dcg.TableFlag.SCROLL_Y | dcg.TableFlag.RESIZABLE if self._columns else dcg.TableFlag.SCROLL_Y)
+
+            if self._columns:
+                for idx, (label, width) in enumerate(self.TABLE_COLUMNS):
+                    self._table.col_config[idx].label = label
+                    self._table.col_config[idx].stretch = width == 0
+                    if width:
+                        self._table.col_config[idx].width = width
 
         self.name = "thread_uclog"
         self.start()
@@ -219,9 +468,26 @@ class UCLOG(Thread):
         # put back the title in the combo box
         self._combo_files.value = self.COMBO_FILES_ITEMS_DEFAULT[0]
 
+    def _cb_set_source_filter(self, sender, target, data) -> None:
+        logger.info(f"sender {sender}, target {target}, data {data}")
+        if data not in self.COMBO_SOURCES_ITEMS_DEFAULT:
+            # remove suffix " ON" or " OFF"
+            data = data.rsplit(" ")[0]
+
+        self._q.put({"type": self.Events.EVENT_APPLY_SOURCE_FILTER, "item": data})
+
+        # put back the title in the combo box
+        self._combo_sources.value = self.COMBO_SOURCES_ITEMS_DEFAULT[0]
+
     def _cb_click_text(self, sender, target, data):
         logger.info(f"sender {sender}, target {target}, data {data}")
         logger.info(f"user_data {target.user_data} : {target.value}")
+        # next/previous jumps continue from the clicked row
+        self._nav_row = target.user_data[self.ROW_USERDATA_IDX_ROW]
+
+    def _cb_button_nav(self, sender, target, data) -> None:
+        logger.info(f"sender {sender}, target {target}, data {data}")
+        self._q.put({"type": self.Events.EVENT_NAV_JUMP, "item": target.user_data})
 
     def _cb_set_level_filter(self, sender, target, data) -> None:
         logger.info(f"sender {sender}, target {target}, data {data}")
@@ -239,6 +505,10 @@ class UCLOG(Thread):
         logger.info(f"sender {sender}, target {target}, data {data}")
         self._window.scaling_factor = float(data.replace('%','')) / 100.0
 
+    def _cb_combo_sort(self, sender, target, data) -> None:
+        logger.info(f"sender {sender}, target {target}, data {data}")
+        self._q.put({"type": self.Events.EVENT_SORT, "item": self.COMBO_SORT_ITEMS[data]})
+
     def _cb_button_export(self, sender, target, data) -> None:
         logger.info(f"sender {sender}, target {target}, data {data}")
         self._q.put({"type": self.Events.EVENT_EXPORT})
@@ -251,13 +521,40 @@ class UCLOG(Thread):
         self._window.label = f"{self.WINDOW_TITLE}"
 
     def _event_purge_log_lines(self):
+        """ Remove the oldest TABLE_ROWS_DELETE_CHUNK rows from the table and the jump lists
+        - this caps widgets and navigation data, LogStore and the _row_at/_row_pos
+          maps keep one entry per row for the full history (a few numbers and the
+          message string per row)
+        """
         logger.info(f"start total {self._num_rows - self._num_rows_start} rows, delete {self.TABLE_ROWS_DELETE_CHUNK} rows")
-        for idx in range(self._num_rows_start, self._num_rows_start + self.TABLE_ROWS_DELETE_CHUNK):
-            del self._table[idx, 0]
+        purge_start = self._num_rows_start
+        for row in range(self._num_rows_start, self._num_rows_start + self.TABLE_ROWS_DELETE_CHUNK):
+            idx = self._row_pos[row]
+            for col in range(len(self.TABLE_COLUMNS) if self._columns else 1):
+                del self._table[idx, col]
 
         self.TABLE_MAX_ROWS += self.TABLE_ROWS_DELETE_CHUNK
         self._num_rows_start += self.TABLE_ROWS_DELETE_CHUNK
 
+        # purged rows are parked in the table rows before _num_rows_start, so
+        # sorting only ever reorders the live rows
+        self._sort_index.drop(self._num_rows_start)
+        if self._sort_index.field is not None:
+            self._sort_index.update(self._filenames)
+            self._table_apply_order()
+
+        for idx in range(purge_start, self._num_rows_start):
+            self._table.row_config[idx].show = False
+
+        # jumps never reach purged rows, keep only live rows in the jump lists
+        for key in list(self._nav_rows.keys()):
+            rows = self._nav_rows[key]
+            del rows[:bisect.bisect_left(rows, self._num_rows_start)]
+            if not rows:
+                del self._nav_rows[key]
+
+        self._nav_pos_rebuild()
+
         self._window.label = f"{self.WINDOW_TITLE} purged {self.TABLE_ROWS_DELETE_CHUNK} rows"
         Timer(5.0, self._tmr_clear_titlebar).start()
 
@@ -265,11 +562,14 @@ class UCLOG(Thread):
         logger.info(f"file_paths {file_paths}")
         if file_paths and len(file_paths) > 0:
 
+            s = self._store
             with open(file_paths[0], "w", newline="") as f:
-                for idx in range(self._num_rows_start, self._num_rows):
-                    row_data = self._table[idx, 0].content.value
-                    t, lvl, file, line, msg = row_data.split(":", 4)
-                    f.write(f"{t.strip()},{lvl.strip()},{file.strip()},{line.strip()},{msg.strip()}\n")
+                for row in range(self._num_rows_start, self._num_rows):
+                    source = self._sources[s.source[row]]
+                    lvl = self._levels[s.lvl[row]]
+                    file = self._filenames[s.file[row]]
+                    # source after line, the first four fields keep their position
+                    f.write(f"{s.t[row]:.4f},{lvl},{file},{s.line[row]},{source},{s.msg[row].strip()}\n")
 
             self._window.label = f"{self.WINDOW_TITLE} exported to: {file_paths[0]}"
             Timer(5.0, self._tmr_clear_titlebar).start()
@@ -293,12 +593,38 @@ class UCLOG(Thread):
         self._q.put({"type": self.Events.EVENT_CLEAR})
 
     def _event_clear(self) -> None:
+        # pending timers would act on the cleared rows
+        for _timer in (self._merge_timer, self._sort_timer):
+            if _timer is not None:
+                _timer.cancel()
+        self._merge_timer = None
+        self._sort_timer = None
+
         self._num_rows = 0
+        self._num_rows_start = 0
+        self.TABLE_MAX_ROWS = type(self).TABLE_MAX_ROWS  # grown by each purge
+        for lvl in self._levels:
+            self._level_counts[lvl] = 0
+        self._nav_rows.clear()
+        self._nav_row = None
+        self._nav_pos = {}
+        self._nav_pos_n = 0
+        self._text_level_counts.value = self._level_counts_str()
+        self._store.clear()
+        self._sort_index.clear()
+        self._row_at = []
+        self._row_pos = []
         self._filenames = []
         self._filenames_filter["all_on"] = True
         self._filenames_filter["all_off"] = False
+        self._merge.clear()
+        self._sources = []
+        self._sources_filter.clear()
+        self._sources_filter["all_on"] = True
+        self._sources_filter["all_off"] = False
         self._table.clear()
         self._combo_file_rebuild()
+        self._combo_source_rebuild()
 
     def _event_apply_file_filter(self, item) -> None:
         logger.info(f"item: {item}")
@@ -323,23 +649,228 @@ class UCLOG(Thread):
         self._combo_file_rebuild()
         self._q.put({"type": self.Events.EVENT_UPDATE_TABLE_SHOW})
 
+    def _event_apply_source_filter(self, item) -> None:
+        logger.info(f"item: {item}")
+
+        if item in ("All ON", "All OFF"):
+            self._sources_filter["all_on"] = item == "All ON"
+            self._sources_filter["all_off"] = item == "All OFF"
+            for s in self._sources:
+                self._sources_filter[s] = item == "All ON"
+
+        else:
+            self._sources_filter["all_on"] = False
+            self._sources_filter["all_off"] = False
+            self._sources_filter[item] = not self._sources_filter[item]
+
+        self._combo_source_rebuild()
+        self._q.put({"type": self.Events.EVENT_UPDATE_TABLE_SHOW})
+
+    def _level_counts_str(self) -> str:
+        return "  ".join(f"{lvl}:{self._level_counts[lvl]}" for lvl in reversed(self._levels))
+
+    def _tmr_update_level_counts(self):
+        self._q.put({"type": self.Events.EVENT_UPDATE_LEVEL_COUNTS})
+
+    def _event_update_level_counts(self, timer_expired: bool = False) -> None:
+        if timer_expired:
+            self._level_counts_timer = None
+
+        # throttle redraws to self.LEVEL_COUNTS_TIMEOUT_SEC, the timer shows the last count
+        if timer() - self._level_counts_last_time > self.LEVEL_COUNTS_TIMEOUT_SEC:
+            self._level_counts_last_time = timer()
+            self._text_level_counts.value = self._level_counts_str()
+
+        elif self._level_counts_timer is None:
+            self._level_counts_timer = Timer(self.LEVEL_COUNTS_TIMEOUT_SEC, self._tmr_update_level_counts)
+            self._level_counts_timer.start()
+
+    def _nav_find(self, level: str, forward: bool) -> int | None:
+        """ Find the next/previous visible row of level from the current row
+        - one binary search per (file, source) that passes the filters
+        - rows purged from the table are skipped
+        - in a sorted view, next/previous follow the table order
+        :param level:
+        :param forward: True for next, False for previous
+        :return: row, or None if there is none
+        """
+        if level not in self._show_levels:
+            return None
+
+        keys = [key for key in self._nav_rows
+                if key[0] == level and self._filenames_filter[key[1]] and self._sources_filter[key[2]]]
+
+        if self._sort_index.field is not None:
+            return self._nav_find_sorted(keys, forward)
+
+        found = None
+        for key in keys:
+            rows = self._nav_rows[key]
+            if forward:
+                cur = -1 if self._nav_row is None else self._nav_row
+                idx = bisect.bisect_right(rows, max(cur, self._num_rows_start - 1))
+                if idx < len(rows) and (found is None or rows[idx] < found):
+                    found = rows[idx]
+
+            else:
+                cur = self._num_rows if self._nav_row is None else self._nav_row
+                idx = bisect.bisect_left(rows, cur) - 1
+                if idx >= 0 and rows[idx] >= self._num_rows_start and (found is None or rows[idx] > found):
+                    found = rows[idx]
+
+        return found
+
+    def _nav_find_sorted(self, keys: list, forward: bool) -> int | None:
+        """ _nav_find() for a sorted view, binary searches on table rows instead of rows
+        - rows indexed by the last sort are in self._nav_pos
+        - rows added since are still at the end of the table, in row order, so
+          their table row is their row number
+        """
+        if self._nav_row is None:
+            cur = -1 if forward else self._num_rows
+        else:
+            cur = self._row_pos[self._nav_row]
+
+        found = None  # table row
+        for key in keys:
+            pos = self._nav_pos.get(key)
+            rows = self._nav_rows[key]
+            tail = bisect.bisect_left(rows, self._nav_pos_n)
+            candidate = None
+
+            if forward:
+                idx = 0 if pos is None else int(np.searchsorted(pos, cur, side="right"))
+                if pos is not None and idx < len(pos):
+                    candidate = int(pos[idx])
+                else:
+                    idx = bisect.bisect_right(rows, cur, lo=tail)
+                    candidate = rows[idx] if idx < len(rows) else None
+
+                if candidate is not None and (found is None or candidate < found):
+                    found = candidate
+
+            else:
+                idx = bisect.bisect_left(rows, cur, lo=tail) - 1
+                if idx >= tail:
+                    candidate = rows[idx]
+                elif pos is not None:
+                    idx = int(np.searchsorted(pos, cur, side="left")) - 1
+                    candidate = int(pos[idx]) if idx >= 0 else None
+
+                if candidate is not None and (found is None or candidate > found):
+                    found = candidate
+
+        return None if found is None else self._row_at[found]
+
+    def _nav_pos_rebuild(self) -> None:
+        """ Table rows of every (level, file, source) in sort order, for jumps in a sorted view
+        """
+        self._nav_pos = {}
+        self._nav_pos_n = self._num_rows
+        if self._sort_index.field is None:
+            return
+
+        # _nav_rows only holds live rows, so only the live part of _row_pos is needed
+        row_pos = np.asarray(self._row_pos[self._num_rows_start:self._num_rows], dtype=np.int64)
+        for key, rows in self._nav_rows.items():
+            self._nav_pos[key] = np.sort(row_pos[np.asarray(rows, dtype=np.int64) - self._num_rows_start])
+
+    def _event_nav_jump(self, item: tuple[str, bool]) -> None:
+        level, forward = item
+        row = self._nav_find(level, forward)
+        if row is None:
+            self._window.label = f"{self.WINDOW_TITLE} no {'next' if forward else 'previous'} {level}"
+            Timer(5.0, self._tmr_clear_titlebar).start()
+            return
+
+        # stop auto scroll, otherwise the next line scrolls away from the jump
+        self._scroll = False
+        self._checkbox_scroll.value = False
+
+        self._nav_row = row
+        self._table[self._row_pos[row], 0].content.focus()
+
     def _event_update_table_show(self):
         logger.info(f"start")
         start = timer()
         _show_levels = self.__show_levels(self._combo_level.value)
 
-        for idx in range(self._num_rows_start, self._num_rows):
-            #logger.info(f"idx {idx} {self._table[idx, 0].content.user_data}")
-            row_data = self._table[idx, 0].content.user_data
-            _show_file = self._filenames_filter[row_data[self.ROW_USERDATA_IDX_FILE]]
-            _show_level = True if row_data[self.ROW_USERDATA_IDX_LEVEL] in _show_levels else False
-            self._table.row_config[idx].show = _show_file and _show_level
+        for row in range(self._num_rows_start, self._num_rows):
+            self._table.row_config[self._row_pos[row]].show = self._row_show(row, _show_levels)
 
         delta = timer() - start
         logger.info(f"apply level filter took {delta:.3f} seconds, {self._num_rows} rows")
 
-    def add_log_line(self, item: tuple[int, float, str, str, int, str]) -> None:
-        self._q.put({"type": self.Events.EVENT_ADD_LOGLINE, "item": item})
+    def _row_show(self, row: int, show_levels: list) -> bool:
+        s = self._store
+        return self._levels[s.lvl[row]] in show_levels and \
+               self._filenames_filter[self._filenames[s.file[row]]] and \
+               self._sources_filter[self._sources[s.source[row]]]
+
+    def _row_config_apply(self, idx: int, row: int) -> None:
+        """ Set background and visibility of table row idx for row
+        """
+        self._table.row_config[idx].bg_color = self._palette[self._store.file[row] % self.NUM_FILENAME_COLORS]
+        self._table.row_config[idx].show = row >= self._num_rows_start and self._row_show(row, self._show_levels)
+
+    def _table_apply_order(self, first: int = 0) -> None:
+        """ Move the live rows to table rows _num_rows_start on, in sort order
+        - rows are moved with swap_rows, row_config stays with the table row so
+          it is set again for every table row that changed
+        - purged rows end up in the table rows before _num_rows_start
+        :param first: first position of the sort order that changed
+        """
+        start = timer()
+        if self._sort_index.field is None:
+            order = range(self._num_rows_start, self._num_rows)
+        else:
+            order = self._sort_index.order
+
+        for idx in range(self._num_rows_start + first, self._num_rows):
+            row = int(order[idx - self._num_rows_start])
+            cur = self._row_pos[row]
+            if cur != idx:
+                other = self._row_at[idx]
+                self._table.swap_rows(idx, cur)
+                self._row_at[idx], self._row_at[cur] = row, other
+                self._row_pos[row], self._row_pos[other] = idx, cur
+
+            self._row_config_apply(idx, row)
+
+        delta = timer() - start
+        logger.info(f"apply sort took {delta:.3f} seconds, {self._num_rows - self._num_rows_start - first} rows")
+
+    def _event_sort(self, field: str | None) -> None:
+        logger.info(f"field: {field}")
+        start = timer()
+        self._sort_index.set_field(field, self._filenames)
+        logger.info(f"sort index took {timer() - start:.3f} seconds, {self._num_rows} rows")
+
+        if field is not None:
+            # a sorted view does not follow new lines
+            self._scroll = False
+            self._checkbox_scroll.value = False
+
+        self._table_apply_order()
+        self._nav_pos_rebuild()
+
+    def _tmr_sort_update(self):
+        self._q.put({"type": self.Events.EVENT_SORT_UPDATE})
+
+    def _event_sort_update(self) -> None:
+        self._sort_timer = None
+        first = self._sort_index.update(self._filenames)
+        if first is not None:
+            self._table_apply_order(first)
+            self._nav_pos_rebuild()
+
+    def add_log_line(self, item: tuple[int, float, str, str, int, str], source: str = SOURCE_DEFAULT) -> None:
+        """ Add a log line, thread safe
+        :param item: (_, timestamp, level, file, line, msg)
+        :param source: id of the producer (core, UART, ...), lines from all
+                       sources are merged in timestamp order
+        """
+        self._q.put({"type": self.Events.EVENT_ADD_LOGLINE, "item": item, "source": source})
 
     def _combo_file_rebuild(self):
         logger.info(f"rebuild combo files")
@@ -361,11 +892,45 @@ class UCLOG(Thread):
 
         self._combo_files.items = _new_files_combo
 
-    def _event_add_logline(self, item: tuple[int, float, str, str, int, str]) -> None:
+    def _combo_source_rebuild(self):
+        logger.info(f"rebuild combo sources")
+        _new_sources_combo = list(self.COMBO_SOURCES_ITEMS_DEFAULT)
+        for s in self._sources:
+            _new_sources_combo.append(f"{s} {'ON' if self._sources_filter[s] else 'OFF'}")
+
+        self._combo_sources.items = _new_sources_combo
+
+    def _tmr_merge_flush(self):
+        self._q.put({"type": self.Events.EVENT_MERGE_FLUSH})
+
+    def _event_merge_logline(self, item: tuple[int, float, str, str, int, str], source: str) -> None:
+        self._merge.push(source, item, timer())
+        self._event_merge_flush()
+
+    def _event_merge_flush(self, timer_expired: bool = False) -> None:
+        if timer_expired:
+            self._merge_timer = None
+
+        for source, item in self._merge.pop_ready(timer()):
+            self._event_add_logline(item, source)
+
+        # lines held back waiting on a silent source are released by the timer
+        if self._merge.pending() and self._merge_timer is None:
+            self._merge_timer = Timer(self._merge.window, self._tmr_merge_flush)
+            self._merge_timer.start()
+
+    def _event_add_logline(self, item: tuple[int, float, str, str, int, str], source: str) -> None:
         startTime = timer()
-        with self._table.next_row:
+        # explicit row, in a sorted view the last table rows may be purged ones
+        with self._table.row(self._num_rows):
             _, t, lvl, file, line, msg = item
 
+            if source not in self._sources:
+                self._sources.append(source)
+                # a new source follows the last All ON/All OFF
+                self._sources_filter[source] = not self._sources_filter["all_off"]
+                self._combo_source_rebuild()
+
             # filenames are tracked to add row background color per filename
             if file not in self._filenames:
                 self._filenames.append(file)
@@ -374,19 +939,41 @@ class UCLOG(Thread):
                 self._filenames_filter[file] = True
                 self._combo_file_rebuild()
 
-            color_idx = self._filenames.index(file) % self.NUM_FILENAME_COLORS
-            self._table.row_config[self._num_rows].bg_color = self._palette[color_idx]
+            self._store.append(t,
+                               self._levels.index(lvl),
+                               self._filenames.index(file),
+                               line,
+                               self._sources.index(source),
+                               msg)
+            self._row_at.append(self._num_rows)
+            self._row_pos.append(self._num_rows)
+
+            if self._columns:
+                values = [f"{t:9.4f}", lvl, file, f"{line:5d}", source, msg]
+            else:
+                # the default source is not shown, single source logs look as before
+                _source = "" if source == self.SOURCE_DEFAULT else f"{source:8s}:"
+                values = [f"{t:9.4f}:{lvl:5s}:{file:30s}:{line:5d}:{_source}{msg}"]
+
+            _texts = [dcg.Text(self._ctx,
+                               theme=self._theme_text_color_map[lvl],
+                               user_data=(self._num_rows,),  # row, for next/previous after a click
+                               value=value) for value in values]
+
+            for _text in _texts:
+                _text.handlers = [dcg.ClickedHandler(self._ctx, callback=self._cb_click_text)]
 
-            _color = self.LOG_LEVEL_COLORS.get(lvl, (0,0,0))
+            self._scroll_last_object = _texts[0]
 
-            self._scroll_last_object = dcg.Text(self._ctx,
-                                                theme=self._theme_text_color_map[lvl],
-                                                user_data=(self._num_rows, lvl, file),  # used for filtering
-                                                value=f"{t:9.4f}:{lvl:5s}:{file:30s}:{line:5d}:{msg}")
+        self._level_counts[lvl] += 1
+        self._nav_rows.setdefault((lvl, file, source), []).append(self._num_rows)
+        self._event_update_level_counts()
 
-            self._scroll_last_object.handlers = [dcg.ClickedHandler(self._ctx, callback=self._cb_click_text)]
+        self._row_config_apply(self._num_rows, self._num_rows)
 
-        self._table.row_config[self._num_rows].show = self._filenames_filter[file] and lvl in self._show_levels
+        if self._sort_index.field is not None and self._sort_timer is None:
+            self._sort_timer = Timer(self.TABLE_SORT_TIMEOUT_SEC, self._tmr_sort_update)
+            self._sort_timer.start()
 
         if self._scroll and self._table.row_config[self._num_rows].show:
             # throttle scrolling to self.TABLE_SCROLL_TIMEOUT_SEC
@@ -436,7 +1023,25 @@ class UCLOG(Thread):
                         self._event_shutdown()
 
                     case self.Events.EVENT_ADD_LOGLINE:
-                        self._event_add_logline(item["item"])
+                        self._event_merge_logline(item["item"], item["source"])
+
+                    case self.Events.EVENT_MERGE_FLUSH:
+                        self._event_merge_flush(timer_expired=True)
+
+                    case self.Events.EVENT_APPLY_SOURCE_FILTER:
+                        self._event_apply_source_filter(item["item"])
+
+                    case self.Events.EVENT_NAV_JUMP:
+                        self._event_nav_jump(item["item"])
+
+                    case self.Events.EVENT_SORT:
+                        self._event_sort(item["item"])
+
+                    case self.Events.EVENT_SORT_UPDATE:
+                        self._event_sort_update()
+
+                    case self.Events.EVENT_UPDATE_LEVEL_COUNTS:
+                        self._event_update_level_counts(timer_expired=True)
 
                     case self.Events.EVENT_APPLY_FILE_FILTER:
                         self._event_apply_file_filter(item["item"])
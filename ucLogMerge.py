@@ -0,0 +1,105 @@
+"""
+MIT License...
+
+Timestamp merge of log lines from several sources, used by ucLog
+"""
+import heapq
+from collections import deque
+
+
+class LogMerge:
+    """ Streaming k-way merge of log lines from several sources
+
+    Each source is assumed to produce lines in timestamp order, so it gets
+    its own FIFO buffer and only the head of each buffer sits in a heap.
+    A line is released once no other live source can still produce an
+    older one, i.e. its timestamp is <= the last timestamp seen from every
+    other source.  Two escapes keep a quiet or lagging source from
+    stalling the view:
+    - lines older than the newest timestamp minus `window` are released
+    - sources silent for more than `window` seconds (wall clock) are
+      ignored when deciding what is safe to release
+
+    For k sources, each released line costs O(log k) heap work, plus one
+    O(k) pass over the sources per pop_ready() call to find the oldest live
+    timestamps.  The history is never re-sorted.
+    """
+
+    def __init__(self, window: float = 0.25):
+        self.window = window
+        self._buffers = {}      # source -> deque of (t, seq, item)
+        self._last_t = {}       # source -> newest timestamp received
+        self._last_seen = {}    # source -> wall time of last line received
+        self._heads = []        # heap of (t, seq, source), one per non empty buffer
+        self._seq = 0           # tie breaker, keeps arrival order for equal timestamps
+        self._max_t = float("-inf")
+
+    def clear(self) -> None:
+        self._buffers.clear()
+        self._last_t.clear()
+        self._last_seen.clear()
+        self._heads.clear()
+        self._max_t = float("-inf")
+
+    def pending(self) -> bool:
+        return len(self._heads) > 0
+
+    def push(self, source: str, item: tuple, now: float) -> None:
+        """ Buffer a line from source
+        :param source: source id
+        :param item: log line tuple, timestamp at index 1
+        :param now: wall clock time of arrival
+        """
+        t = item[1]
+        buf = self._buffers.get(source)
+        if buf is None:
+            buf = self._buffers[source] = deque()
+
+        self._seq += 1
+        if not buf:
+            heapq.heappush(self._heads, (t, self._seq, source))
+        buf.append((t, self._seq, item))
+
+        self._last_t[source] = max(t, self._last_t.get(source, t))
+        self._last_seen[source] = now
+        self._max_t = max(self._max_t, t)
+
+    def pop_ready(self, now: float) -> list:
+        """ Release all lines that can no longer be preceded by a new line
+        :param now: wall clock time
+        :return: list of (source, item), in timestamp order
+        """
+        ready = []
+        horizon = self._max_t - self.window
+        (first_t, first_source), (second_t, _) = self._watermarks(now)
+        while self._heads:
+            t, _, source = self._heads[0]
+            # a source never waits on itself
+            mark = second_t if source == first_source else first_t
+            if t > horizon and t > mark:
+                break
+
+            heapq.heappop(self._heads)
+            buf = self._buffers[source]
+            ready.append((source, buf.popleft()[2]))
+            if buf:
+                t_next, seq_next, _ = buf[0]
+                heapq.heappush(self._heads, (t_next, seq_next, source))
+
+        return ready
+
+    def _watermarks(self, now: float) -> tuple:
+        """ Two oldest timestamps live sources could still send
+        - the second one is the watermark for the source holding the first
+        :param now: wall clock time
+        :return: ((t, source), (t, source)), inf when there is no such source
+        """
+        first = second = (float("inf"), None)
+        for s, t in self._last_t.items():
+            if now - self._last_seen[s] > self.window:
+                continue
+            if t < first[0]:
+                first, second = (t, s), first
+            elif t < second[0]:
+                second = (t, s)
+        return first, second